@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the log watcher's parsing and alert dispatch
+Run from this directory: python -m unittest test_watcher
+"""
+
+import queue
+import unittest
+from unittest import mock
+
+import watcher
+
+
+class FakeSlack:
+    """Stand-in for _post_slack_alert that records posts and can fail on demand"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.posts = []
+
+    def __call__(self, alert_type, message, details, now):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.posts.append((alert_type, message, details))
+        return True
+
+    @property
+    def types(self):
+        return [post[0] for post in self.posts]
+
+
+def alert(alert_type, message='msg', now=0.0):
+    return (alert_type, message, {'Key': 'value'}, now)
+
+
+class AlertDispatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.slack = FakeSlack()
+        patches = [
+            mock.patch.object(watcher, '_post_slack_alert', self.slack),
+            mock.patch.object(watcher, 'ALERT_COOLDOWN_SEC', 300),
+            mock.patch.object(watcher, '_ALERT_RETRY_SEC', 30),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.dispatcher = watcher._AlertDispatcher()
+
+    def test_first_alert_is_posted_immediately(self):
+        self.dispatcher.handle(alert('High Error Rate'), 0.0)
+
+        self.assertEqual(self.slack.types, ['High Error Rate'])
+        self.assertIsNone(self.dispatcher.timeout(1.0))
+
+    def test_repeats_within_cooldown_are_coalesced(self):
+        self.dispatcher.handle(alert('High Error Rate', 'first'), 0.0)
+        self.dispatcher.handle(alert('High Error Rate', 'second'), 10.0)
+        self.dispatcher.handle(alert('High Error Rate', 'third'), 20.0)
+
+        self.dispatcher.flush_due(299.0)
+        self.assertEqual(len(self.slack.posts), 1)
+        self.assertEqual(self.dispatcher.timeout(299.0), 1.0)
+
+        self.dispatcher.flush_due(300.0)
+        alert_type, message, details = self.slack.posts[-1]
+        self.assertEqual(alert_type, 'High Error Rate (x2)')
+        self.assertEqual(message, 'second\nthird')
+        self.assertEqual(details['Occurrences'], '2')
+
+    def test_failed_post_is_retried_before_cooldown_starts(self):
+        self.slack.failures = 1
+        self.dispatcher.handle(alert('High Error Rate'), 0.0)
+        self.assertEqual(self.slack.posts, [])
+
+        self.dispatcher.flush_due(29.0)
+        self.assertEqual(self.slack.posts, [])
+
+        self.dispatcher.flush_due(30.0)
+        self.assertEqual(self.slack.types, ['High Error Rate'])
+        self.assertEqual(self.dispatcher.next_allowed['High Error Rate'], 330.0)
+
+    def test_transitions_skip_cooldown_and_keep_order(self):
+        for now, alert_type in [(0.0, 'Failover Detected'), (2.5, 'Recovery Detected'),
+                                (2.6, 'Failover Detected'), (2.7, 'Recovery Detected')]:
+            self.dispatcher.flush_due(now)
+            self.dispatcher.handle(alert(alert_type), now)
+
+        self.assertEqual(self.slack.types, [
+            'Failover Detected', 'Recovery Detected', 'Failover Detected', 'Recovery Detected'
+        ])
+
+    def test_failed_transition_is_superseded_by_newer_one(self):
+        self.slack.failures = 1
+        self.dispatcher.handle(alert('Failover Detected'), 0.0)
+        self.dispatcher.handle(alert('Recovery Detected'), 0.4)
+
+        self.dispatcher.flush_due(31.0)
+        self.assertEqual(self.slack.types, ['Recovery Detected'])
+        self.assertIsNone(self.dispatcher.timeout(31.0))
+
+    def test_failed_transition_is_retried(self):
+        self.slack.failures = 1
+        self.dispatcher.handle(alert('Failover Detected'), 0.0)
+        self.assertEqual(self.dispatcher.timeout(0.0), 30.0)
+
+        self.dispatcher.flush_due(30.0)
+        self.assertEqual(self.slack.types, ['Failover Detected'])
+        self.assertIsNone(self.dispatcher.timeout(30.0))
+
+    def test_error_rate_alerts_do_not_delay_transitions(self):
+        self.dispatcher.handle(alert('High Error Rate'), 0.0)
+        self.dispatcher.handle(alert('High Error Rate'), 1.0)
+        self.dispatcher.handle(alert('Failover Detected'), 2.0)
+
+        self.assertEqual(self.slack.types, ['High Error Rate', 'Failover Detected'])
+
+
+class SendSlackAlertTest(unittest.TestCase):
+
+    def setUp(self):
+        self.alert_q = queue.Queue()
+        patches = [
+            mock.patch.object(watcher, 'SLACK_WEBHOOK_URL', 'https://example.invalid/hook'),
+            mock.patch.object(watcher, 'MAINTENANCE_MODE', False),
+            mock.patch.object(watcher, '_ALERT_Q', self.alert_q),
+            mock.patch.object(watcher, '_ALERT_Q_LIMIT', 2),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_droppable_alerts_respect_queue_limit(self):
+        self.assertTrue(watcher.send_slack_alert('High Error Rate', 'm', {}, droppable=True))
+        self.assertTrue(watcher.send_slack_alert('High Error Rate', 'm', {}, droppable=True))
+        self.assertFalse(watcher.send_slack_alert('High Error Rate', 'm', {}, droppable=True))
+        self.assertEqual(self.alert_q.qsize(), 2)
+
+    def test_transition_alerts_are_never_dropped(self):
+        for _ in range(3):
+            watcher.send_slack_alert('High Error Rate', 'm', {}, droppable=True)
+
+        self.assertTrue(watcher.send_slack_alert('Failover Detected', 'm', {}))
+        self.assertEqual(self.alert_q.qsize(), 3)
+
+
+class ParseTest(unittest.TestCase):
+    LINE = ('[28/Jan/2025:10:30:45 +0000] method=GET uri=/version status=502 pool=green '
+            'release=r1 upstream_addr=10.0.0.2:3000, 10.0.0.3:3000 upstream_status=502, 200 '
+            'request_time=0.010 upstream_response_time=0.005, 0.005 client=1.2.3.4\n')
+
+    def test_parse_log_fast(self):
+        self.assertEqual(watcher.parse_log_fast(self.LINE), ('green', 502))
+        self.assertEqual(watcher.parse_log_fast('[x] status=200 pool=\n'), ('-', 200))
+        self.assertIsNone(watcher.parse_log_fast('[x pool=blue] status=200'))
+        self.assertIsNone(watcher.parse_log_fast('no timestamp pool=blue'))
+
+    def test_parse_log_line_keeps_multi_upstream_values(self):
+        entry = watcher.parse_log_line(self.LINE)
+
+        self.assertEqual(entry.status, 502)
+        self.assertEqual(entry.upstream_addr, '10.0.0.2:3000, 10.0.0.3:3000')
+        self.assertEqual(entry.upstream_status, '502, 200')
+        self.assertEqual(entry.client, '1.2.3.4')
+
+    def test_non_decimal_status_is_zero(self):
+        line = '[x] pool=blue status=²'
+        self.assertEqual(watcher.parse_log_fast(line), ('blue', 0))
+        self.assertEqual(watcher.parse_log_line(line).status, 0)
+
+    def test_uri_fast(self):
+        self.assertEqual(watcher.uri_fast(self.LINE), '/version')
+        self.assertEqual(watcher.uri_fast('[x] status=500 pool=blue'), '-')
+
+
+if __name__ == '__main__':
+    unittest.main()
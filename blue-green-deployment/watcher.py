@@ -6,13 +6,21 @@ Monitors Nginx logs for failover events and error rates, sends alerts to Slack
 
 import os
 import io
-import re
+import stat
+import sys
 import time
+import queue
+import threading
 import json
 import requests
 from datetime import datetime
 from collections import deque
-from typing import Optional, Dict
+from typing import Callable, NamedTuple, Optional, Dict, Tuple
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # non-Linux or package not installed: fall back to polling
+    INotify = None
 
 # Configuration from environment variables
 SLACK_WEBHOOK_URL = os.getenv('SLACK_WEBHOOK_URL', '')
@@ -20,42 +28,223 @@ ERROR_RATE_THRESHOLD = float(os.getenv('ERROR_RATE_THRESHOLD', '2.0'))  # percen
 WINDOW_SIZE = int(os.getenv('WINDOW_SIZE', '200'))  # number of requests
 ALERT_COOLDOWN_SEC = int(os.getenv('ALERT_COOLDOWN_SEC', '300'))  # seconds
 LOG_FILE = os.getenv('NGINX_LOG_FILE', '/var/log/nginx/access.log')
+LOG_FORMAT = os.getenv('NGINX_LOG_FORMAT', '')  # nginx log_format string, optional
 MAINTENANCE_MODE = os.getenv('MAINTENANCE_MODE', 'false').lower() == 'true'
 
 # State tracking
 last_seen_pool: Optional[str] = None
-request_window = deque(maxlen=WINDOW_SIZE)
-last_alert_times: Dict[str, float] = {}
+# Sliding window as a ring buffer of 5xx flags (1 byte per request)
+request_window = bytearray(WINDOW_SIZE)
+window_pos = 0  # next slot to overwrite
+window_filled = 0  # slots written so far, capped at WINDOW_SIZE
+error_count = 0  # number of 5xx flags currently set in request_window
+# High error rate is a level, not an edge: alert on each crossing of the
+# threshold and at most once per ALERT_COOLDOWN_SEC while it stays above
+error_alert_after = 0.0
+error_alert_skip_noted = False  # "cooldown active" already printed for this window
+
+# Shared session so the webhook connection (TCP + TLS) is reused across alerts
+_SLACK_SESSION = requests.Session()
+_SLACK_SESSION.headers.update({'Content-Type': 'application/json'})
+
+# Static Slack attachment envelope: color, title, text, fields (JSON), ts
+_SLACK_TEMPLATE = (
+    '{"attachments": [{"color": %s, "title": %s, "text": %s, "fields": %s, '
+    '"footer": "Blue/Green Monitoring", "ts": %d}]}'
+)
+
+# One read() per 1MB of log data when the tailer is behind
+_READ_SIZE = 1024 * 1024
+
+# Per-request console lines; main() swaps in a block-buffered stderr writer.
+# Flushed before alert banners and whenever the tailer is idle.
+_HOT_LOG = sys.stderr
+
+# Alerts are posted by a background thread; the main loop only enqueues.
+# The queue is unbounded so failover/recovery alerts are never dropped;
+# droppable alerts are refused once _ALERT_Q_LIMIT items are waiting.
+_ALERT_Q: "queue.Queue" = queue.Queue()
+_ALERT_Q_LIMIT = 1024
+_COALESCE_KEEP = 10  # most recent alert messages listed in a coalesced summary
+_ALERT_RETRY_SEC = 30  # delay before re-posting alerts whose POST failed
+# Pool transitions: posted without cooldown so Slack reflects the current pool
+_EDGE_ALERTS = frozenset({"Failover Detected", "Recovery Detected"})
+
+
+def _buffered_stderr():
+    """Block-buffered writer on stderr's fd (the container runs python -u), or sys.stderr if it has none"""
+    try:
+        fd = sys.stderr.fileno()
+    except (AttributeError, ValueError, io.UnsupportedOperation):
+        return sys.stderr
+    return io.TextIOWrapper(
+        io.BufferedWriter(io.FileIO(fd, 'w', closefd=False), buffer_size=64 * 1024),
+        encoding='utf-8',
+        errors='replace'
+    )
+
+
+def _tokenize_fields(line: str, end: int) -> Dict[str, str]:
+    """Split the key=value tokens after the timestamp (any order, any subset)"""
+    # The format is a bracketed timestamp followed by space-separated
+    # key=value tokens, so a plain split is enough (no regex backtracking).
+    fields: Dict[str, str] = {}
+    key = None
+    for token in line[end + 1:].split():
+        if '=' in token:
+            key, _, value = token.partition('=')
+            fields[key] = value
+        elif key is not None:
+            # Multi-upstream values are comma+space separated, e.g.
+            # upstream_addr=10.0.0.2:3000, 10.0.0.3:3000
+            fields[key] += ' ' + token
+    return fields
+
+
+def _build_field_splitter(log_format: str) -> Optional[Callable[[str, int], Optional[Dict[str, str]]]]:
+    """
+    Build a splitter specialized for the configured nginx log_format
+    Example format: [$time_local] method=$request_method uri=$request_uri status=$status ...
+    Returns None if the format is not a bracketed timestamp followed by key=$var tokens.
+    """
+    tokens = log_format.split()
+    if not tokens or not tokens[0].startswith('[') or ']' not in log_format:
+        return None
+
+    # Skip the remainder of the timestamp variable (e.g. "[$time_local]")
+    first = next((i for i, t in enumerate(tokens) if t.endswith(']')), None)
+    if first is None:
+        return None
+    keys = []
+    for token in tokens[first + 1:]:
+        key, sep, _ = token.partition('=')
+        if not sep or not key:
+            return None
+        keys.append(key)
+    if not keys:
+        return None
 
+    # Fields appear in a fixed order, so each " key=" marker is located with a
+    # forward find; values may contain spaces (e.g. "502, 200").
+    markers = [(key, f' {key}=', len(key) + 2) for key in keys]
 
-def parse_log_line(line: str) -> Optional[Dict[str, str]]:
+    def split_fields(line: str, end: int) -> Optional[Dict[str, str]]:
+        fields: Dict[str, str] = {}
+        prev_key = None
+        prev_start = 0
+        pos = end
+        for key, marker, width in markers:
+            start = line.find(marker, pos)
+            if start < 0:
+                return None  # line doesn't match this format
+            if prev_key is not None:
+                fields[prev_key] = line[prev_start:start]
+            prev_key = key
+            prev_start = pos = start + width
+        fields[prev_key] = line[prev_start:].rstrip()
+        return fields
+
+    return split_fields
+
+
+# Use the specialized splitter when NGINX_LOG_FORMAT is set, otherwise tokenize
+_split_fields = _build_field_splitter(LOG_FORMAT) or _tokenize_fields
+
+
+class LogEntry(NamedTuple):
+    """One parsed access log line (fixed fields, cheaper than a dict per line)"""
+    timestamp: str
+    method: str
+    uri: str
+    status: int
+    pool: str
+    release: str
+    upstream_addr: str
+    upstream_status: str
+    request_time: str
+    upstream_response_time: str
+    client: str
+
+
+def parse_log_line(line: str) -> Optional[LogEntry]:
     """
     Parse Nginx log line in custom format
     Example: [28/Jan/2025:10:30:45 +0000] method=GET uri=/version status=200 pool=blue ...
     """
-    pattern = r'\[([^\]]+)\] (?:method=(\S+) )?(?:uri=(\S+) )?(?:status=(\d+) )?(?:pool=(\S+) )?(?:release=(\S+) )?(?:upstream_addr=(\S+) )?(?:upstream_status=(\S+) )?(?:request_time=(\S+) )?(?:upstream_response_time=(\S+) )?(?:client=(\S+))?'
-    
-    match = re.search(pattern, line)
-    if not match:
+    # Cheap rejects first: lines that aren't in our format or carry no pool
+    # field are skipped without tokenizing.
+    if not line.startswith('[') or 'pool=' not in line:
         return None
-    
-    return {
-        'timestamp': match.group(1),
-        'method': match.group(2) or '-',
-        'uri': match.group(3) or '-',
-        'status': match.group(4) or '-',
-        'pool': match.group(5) or '-',
-        'release': match.group(6) or '-',
-        'upstream_addr': match.group(7) or '-',
-        'upstream_status': match.group(8) or '-',
-        'request_time': match.group(9) or '0',
-        'upstream_response_time': match.group(10) or '0',
-        'client': match.group(11) or '-'
-    }
-
-
-def send_slack_alert(alert_type: str, message: str, details: Dict[str, str]) -> bool:
-    """Send alert to Slack with rate limiting"""
+
+    end = line.find(']')
+    if end < 0:
+        return None
+
+    fields = _split_fields(line, end)
+    if fields is None:
+        fields = _tokenize_fields(line, end)
+
+    get = fields.get
+    status = get('status', '')
+    return LogEntry(
+        timestamp=line[1:end],
+        method=get('method') or '-',
+        uri=get('uri') or '-',
+        status=int(status) if status.isdecimal() else 0,
+        pool=get('pool') or '-',
+        release=get('release') or '-',
+        upstream_addr=get('upstream_addr') or '-',
+        upstream_status=get('upstream_status') or '-',
+        request_time=get('request_time') or '0',
+        upstream_response_time=get('upstream_response_time') or '0',
+        client=get('client') or '-'
+    )
+
+
+def parse_log_fast(line: str) -> Optional[Tuple[str, int]]:
+    """
+    Extract only (pool, status) from a log line for the per-request hot path.
+    The full parse_log_line is reserved for lines that end up in an alert.
+    """
+    if not line.startswith('['):
+        return None
+    p = line.find(' pool=')
+    if p < 0 or line.find(']', 0, p) < 0:
+        return None  # mirror parse_log_line's rejects so it can re-parse any line we accept
+    p += 6
+    e = line.find(' ', p)
+    pool = (line[p:e] if e >= 0 else line[p:].rstrip()) or '-'
+
+    s = line.find(' status=')
+    if s < 0:
+        return pool, 0
+    s += 8
+    e = line.find(' ', s)
+    status = line[s:e] if e >= 0 else line[s:].rstrip()
+    return pool, int(status) if status.isdecimal() else 0
+
+
+def uri_fast(line: str) -> str:
+    """Extract just the uri field for console output (no full parse)"""
+    u = line.find(' uri=')
+    if u < 0:
+        return '-'
+    u += 5
+    e = line.find(' ', u)
+    return (line[u:e] if e >= 0 else line[u:].rstrip()) or '-'
+
+
+# Prefer the compiled parser when it has been built (see watcher_fast.pyx)
+try:
+    from watcher_fast import parse_log_fast
+except ImportError:
+    pass
+
+
+def send_slack_alert(alert_type: str, message: str, details: Dict[str, str], droppable: bool = False) -> bool:
+    """Queue an alert for Slack (delivery and burst coalescing happen in _alert_worker)"""
+    _HOT_LOG.flush()  # emit buffered request lines leading up to the alert
+
     if not SLACK_WEBHOOK_URL:
         print(f"⚠️  No Slack webhook configured. Alert: {alert_type}")
         return False
@@ -64,42 +253,35 @@ def send_slack_alert(alert_type: str, message: str, details: Dict[str, str]) ->
         print(f"🔧 Maintenance mode enabled. Suppressing alert: {alert_type}")
         return False
     
-    # Check cooldown
-    now = time.time()
-    if alert_type in last_alert_times:
-        time_since_last = now - last_alert_times[alert_type]
-        if time_since_last < ALERT_COOLDOWN_SEC:
-            print(f"⏱️  Alert cooldown active for {alert_type}. Skipping. ({int(ALERT_COOLDOWN_SEC - time_since_last)}s remaining)")
-            return False
-    
-    # Build Slack message
+    # Hand off to the alert worker so a slow webhook never stalls log ingestion
+    if droppable and _ALERT_Q.qsize() >= _ALERT_Q_LIMIT:
+        print(f"❌ Alert queue full. Dropping alert: {alert_type}")
+        return False
+    _ALERT_Q.put_nowait((alert_type, message, details, time.time()))
+    return True
+
+
+def _post_slack_alert(alert_type: str, message: str, details: Dict[str, str], now: float) -> bool:
+    """POST a single alert to the Slack webhook"""
+    # Build Slack message: only the dynamic parts are JSON-encoded
     color = "#ff0000" if "error" in alert_type.lower() else "#ffa500"
-    
-    slack_payload = {
-        "attachments": [{
-            "color": color,
-            "title": f"🚨 {alert_type}",
-            "text": message,
-            "fields": [
-                {"title": key, "value": value, "short": True}
-                for key, value in details.items()
-            ],
-            "footer": "Blue/Green Monitoring",
-            "ts": int(now)
-        }]
-    }
+    fields = json.dumps([
+        {"title": key, "value": value, "short": True}
+        for key, value in details.items()
+    ])
+    body = _SLACK_TEMPLATE % (
+        json.dumps(color), json.dumps(f"🚨 {alert_type}"), json.dumps(message), fields, int(now)
+    )
     
     try:
-        response = requests.post(
+        response = _SLACK_SESSION.post(
             SLACK_WEBHOOK_URL,
-            json=slack_payload,
-            headers={'Content-Type': 'application/json'},
+            data=body.encode('ascii'),  # json.dumps escapes non-ASCII
             timeout=10
         )
         
         if response.status_code == 200:
             print(f"✅ Slack alert sent: {alert_type}")
-            last_alert_times[alert_type] = now
             return True
         else:
             print(f"❌ Slack alert failed: {response.status_code} - {response.text}")
@@ -110,8 +292,117 @@ def send_slack_alert(alert_type: str, message: str, details: Dict[str, str]) ->
         return False
 
 
-def check_failover(current_pool: str, log_entry: Dict[str, str]) -> None:
-    """Detect and alert on pool failover events"""
+def _post_coalesced(alert_type: str, alerts: "deque", count: int, first_seen: float) -> bool:
+    """POST one Slack message summarizing alerts of a type held back during the cooldown"""
+    _, message, details, now = alerts[-1]
+    if count == 1:
+        return _post_slack_alert(alert_type, message, details, now)
+
+    lines = [alert[1] for alert in alerts]
+    if count > len(alerts):
+        lines.append(f"…and {count - len(alerts)} earlier")
+    summary = dict(details)
+    summary["Occurrences"] = str(count)
+    summary["First Seen"] = datetime.fromtimestamp(first_seen).strftime('%Y-%m-%d %H:%M:%S')
+    return _post_slack_alert(f"{alert_type} (x{count})", "\n".join(lines), summary, now)
+
+
+class _AlertDispatcher:
+    """
+    Cooldown, coalescing and retry state for the alert worker thread.
+    Failover/recovery alerts are edges of one pool state, so they skip the
+    cooldown and are posted in arrival order; Slack always shows the latest
+    transition (a failed one awaiting retry is dropped when a newer one
+    arrives). Other alerts (High Error Rate): the first of a type is posted
+    immediately; further alerts of that type within ALERT_COOLDOWN_SEC are
+    coalesced into one summary posted when it ends. The cooldown only starts
+    once a post succeeds; failed posts are retried after _ALERT_RETRY_SEC.
+    """
+
+    def __init__(self) -> None:
+        # alert_type -> earliest time the next alert of that type may be posted
+        self.next_allowed: Dict[str, float] = {}
+        # alert_type -> [count, first_seen, most recent alerts]; only present
+        # while now < next_allowed[alert_type]
+        self.pending: Dict[str, list] = {}
+        # failed failover/recovery alert awaiting a retry, and when to retry it
+        self.edge_retry: Optional[tuple] = None
+        self.edge_retry_at = 0.0
+
+    def timeout(self, now: float) -> Optional[float]:
+        """Seconds until the next scheduled post, or None if nothing is waiting"""
+        due = [self.next_allowed[t] for t in self.pending]
+        if self.edge_retry is not None:
+            due.append(self.edge_retry_at)
+        return max(0.0, min(due) - now) if due else None
+
+    def flush_due(self, now: float) -> None:
+        """Post retries and coalesced summaries whose time has come"""
+        if self.edge_retry is not None and now >= self.edge_retry_at:
+            self._post_edge(self.edge_retry, now)
+
+        for alert_type in [t for t in self.pending if now >= self.next_allowed[t]]:
+            count, first_seen, alerts = self.pending[alert_type]
+            if _post_coalesced(alert_type, alerts, count, first_seen):
+                del self.pending[alert_type]
+                self.next_allowed[alert_type] = now + ALERT_COOLDOWN_SEC
+            else:
+                self.next_allowed[alert_type] = now + _ALERT_RETRY_SEC  # keep pending, retry
+
+    def handle(self, alert: tuple, now: float) -> None:
+        """Post, coalesce or hold one alert taken from the queue"""
+        alert_type = alert[0]
+        if alert_type in _EDGE_ALERTS:
+            if self.edge_retry is not None:
+                # A newer transition supersedes the one waiting for a retry,
+                # so a stale failover can never be posted after a recovery
+                print(f"⏭️  Dropping unsent {self.edge_retry[0]} alert; superseded by {alert_type}")
+                self.edge_retry = None
+            self._post_edge(alert, now)
+            return
+
+        # Single lookup on the common path (no recent alert of this type)
+        if now >= self.next_allowed.get(alert_type, 0.0):
+            if _post_slack_alert(*alert):
+                self.next_allowed[alert_type] = now + ALERT_COOLDOWN_SEC
+            else:
+                # Cooldown only starts on success; hold the alert for a retry
+                self.next_allowed[alert_type] = now + _ALERT_RETRY_SEC
+                self.pending[alert_type] = [1, alert[3], deque([alert], maxlen=_COALESCE_KEEP)]
+        elif alert_type in self.pending:
+            entry = self.pending[alert_type]
+            entry[0] += 1
+            entry[2].append(alert)
+        else:
+            print(f"⏱️  Alert cooldown active for {alert_type}. Coalescing for {int(self.next_allowed[alert_type] - now)}s")
+            self.pending[alert_type] = [1, alert[3], deque([alert], maxlen=_COALESCE_KEEP)]
+
+    def _post_edge(self, alert: tuple, now: float) -> None:
+        if _post_slack_alert(*alert):
+            if self.edge_retry is alert:
+                self.edge_retry = None
+        else:
+            self.edge_retry = alert
+            self.edge_retry_at = now + _ALERT_RETRY_SEC
+
+
+def _alert_worker() -> None:
+    """Background thread draining the alert queue (see _AlertDispatcher)"""
+    dispatcher = _AlertDispatcher()
+    while True:
+        try:
+            alert = _ALERT_Q.get(timeout=dispatcher.timeout(time.time()))
+        except queue.Empty:
+            alert = None
+
+        now = time.time()
+        dispatcher.flush_due(now)
+        if alert is not None:
+            dispatcher.handle(alert, now)
+
+
+def check_transition(current_pool: str, initial_pool: str, line: str) -> None:
+    """Detect pool changes and alert once per edge: failover, or recovery back to the initial pool"""
     global last_seen_pool
     
     if last_seen_pool is None:
@@ -119,54 +410,14 @@ def check_failover(current_pool: str, log_entry: Dict[str, str]) -> None:
         print(f"📍 Initial pool detected: {current_pool}")
         return
     
-    if current_pool != last_seen_pool and current_pool != '-':
-        print(f"🔄 FAILOVER DETECTED: {last_seen_pool} → {current_pool}")
-        
-        send_slack_alert(
-            alert_type="Failover Detected",
-            message=f"Traffic has switched from *{last_seen_pool}* to *{current_pool}*",
-            details={
-                "Previous Pool": last_seen_pool,
-                "Current Pool": current_pool,
-                "Release": log_entry.get('release', 'unknown'),
-                "Upstream": log_entry.get('upstream_addr', 'unknown'),
-                "Timestamp": log_entry.get('timestamp', 'unknown')
-            }
-        )
-        
-        last_seen_pool = current_pool
-
-
-def check_error_rate() -> None:
-    """Calculate error rate over sliding window and alert if threshold exceeded"""
-    if len(request_window) < WINDOW_SIZE:
-        return  # Not enough data yet
-    
-    error_count = sum(1 for status in request_window if status >= 500)
-    error_rate = (error_count / len(request_window)) * 100
-    
-    if error_rate > ERROR_RATE_THRESHOLD:
-        print(f"⚠️  HIGH ERROR RATE: {error_rate:.2f}% ({error_count}/{len(request_window)} requests)")
-        
-        send_slack_alert(
-            alert_type="High Error Rate",
-            message=f"Error rate has exceeded threshold: *{error_rate:.2f}%*",
-            details={
-                "Error Rate": f"{error_rate:.2f}%",
-                "Threshold": f"{ERROR_RATE_THRESHOLD}%",
-                "Errors": str(error_count),
-                "Window Size": str(WINDOW_SIZE),
-                "Action": "Check upstream container logs"
-            }
-        )
+    if current_pool == last_seen_pool or current_pool == '-':
+        return
 
+    previous_pool = last_seen_pool
+    last_seen_pool = current_pool
 
-def check_recovery(current_pool: str, initial_pool: str) -> None:
-    """Detect when primary pool has recovered and is serving traffic again"""
-    global last_seen_pool
-    
-    # If we're back to the initial pool after a failover
-    if current_pool == initial_pool and last_seen_pool != initial_pool:
+    _HOT_LOG.flush()  # show the buffered requests before the banner
+    if current_pool == initial_pool:
         print(f"✅ RECOVERY DETECTED: Back to {initial_pool}")
         
         send_slack_alert(
@@ -178,21 +429,109 @@ def check_recovery(current_pool: str, initial_pool: str) -> None:
                 "Action": "No action required"
             }
         )
+        return
 
+    print(f"🔄 FAILOVER DETECTED: {previous_pool} → {current_pool}")
+    log_entry = parse_log_line(line)  # full parse only when alerting
+    
+    send_slack_alert(
+        alert_type="Failover Detected",
+        message=f"Traffic has switched from *{previous_pool}* to *{current_pool}*",
+        details={
+            "Previous Pool": previous_pool,
+            "Current Pool": current_pool,
+            "Release": log_entry.release,
+            "Upstream": log_entry.upstream_addr,
+            "Timestamp": log_entry.timestamp
+        }
+    )
 
-def tail_file(file_path: str):
-    """Tail a file like 'tail -f'"""
-    print(f"📖 Starting to tail log file: {file_path}")
+
+def push_status(status_code: int) -> None:
+    """Record a status in the sliding window, keeping error_count in sync"""
+    global window_pos, window_filled, error_count
+
+    is_error = 1 if status_code >= 500 else 0
+    error_count += is_error - request_window[window_pos]  # slot being overwritten
+    request_window[window_pos] = is_error
+    window_pos += 1
+    if window_pos == WINDOW_SIZE:
+        window_pos = 0
+    if window_filled < WINDOW_SIZE:
+        window_filled += 1
+
+
+def check_error_rate() -> None:
+    """Calculate error rate over sliding window and alert if threshold exceeded"""
+    global error_alert_after, error_alert_skip_noted
+
+    if window_filled < WINDOW_SIZE:
+        return  # Not enough data yet
     
-    # Wait for file to exist
-    while not os.path.exists(file_path):
-        print(f"⏳ Waiting for log file to be created: {file_path}")
-        time.sleep(2)
+    error_rate = error_count * 100 / WINDOW_SIZE
+    
+    if error_rate <= ERROR_RATE_THRESHOLD:
+        error_alert_after = 0.0  # re-arm: the next crossing alerts immediately
+        error_alert_skip_noted = False
+        return
+
+    now = time.time()
+    if now < error_alert_after:
+        # One line per window rather than one per check
+        if not error_alert_skip_noted:
+            error_alert_skip_noted = True
+            print(f"⏱️  Alert cooldown active for High Error Rate. Skipping. ({int(error_alert_after - now)}s remaining)")
+        return
+
+    error_alert_after = now + ALERT_COOLDOWN_SEC
+    error_alert_skip_noted = False
+    _HOT_LOG.flush()  # show the buffered 5xx lines before the banner
+    print(f"⚠️  HIGH ERROR RATE: {error_rate:.2f}% ({error_count}/{WINDOW_SIZE} requests)")
     
-    with open(file_path, 'r') as file:
-        # Try to go to end of file for normal regular files. Some mounts
-        # (named pipes or non-seekable streams) will raise UnsupportedOperation
-        # — handle that gracefully by falling back to streaming reads.
+    send_slack_alert(
+        alert_type="High Error Rate",
+        message=f"Error rate has exceeded threshold: *{error_rate:.2f}%*",
+        details={
+            "Error Rate": f"{error_rate:.2f}%",
+            "Threshold": f"{ERROR_RATE_THRESHOLD}%",
+            "Errors": str(error_count),
+            "Window Size": str(WINDOW_SIZE),
+            "Action": "Check upstream container logs"
+        },
+        droppable=True
+    )
+
+
+def _watch_for_writes(file_path: str, inotify=None):
+    """Add an inotify IN_MODIFY watch on file_path; returns None to fall back to polling"""
+    if INotify is None:
+        return None
+    try:
+        if inotify is None:
+            inotify = INotify()
+        inotify.add_watch(file_path, flags.MODIFY)
+        return inotify
+    except OSError as e:
+        print(f"⚠️  inotify unavailable ({e}); falling back to polling")
+        return None
+
+
+def _wait_for_writes(inotify) -> None:
+    """Block until the log is written to, or a short timeout elapses"""
+    _HOT_LOG.flush()  # caught up with the log: good time to emit buffered lines
+    if inotify is not None:
+        # 1s timeout as a safety net (e.g. log rotation)
+        inotify.read(timeout=1000)
+    else:
+        time.sleep(0.1)  # Wait for new content
+
+
+def _tail_stream(file_path: str, inotify):
+    """Tail a non-regular file (e.g. a named pipe) with buffered readline()"""
+    # Large read buffer: one read() syscall covers many log lines when busy
+    with open(file_path, 'r', buffering=1024 * 1024) as file:
+        # Some mounts (named pipes or non-seekable streams) will raise
+        # UnsupportedOperation — fall back to streaming reads.
         try:
             file.seek(0, 2)
         except (io.UnsupportedOperation, OSError):
@@ -201,14 +540,85 @@ def tail_file(file_path: str):
         while True:
             line = file.readline()
             if not line:
-                time.sleep(0.1)  # Wait for new content
+                _wait_for_writes(inotify)
+                continue
+
+            # Trailing newline is left in place; the parser splits on whitespace
+            yield line
+
+
+def _tail_regular(file_path: str, inotify):
+    """Tail a regular file with large positional reads, yielding only complete lines"""
+    # pread() past EOF just returns b'' (unlike touching an mmap past a
+    # truncated end, which raises SIGBUS), so copytruncate is handled safely.
+    file = open(file_path, 'rb', buffering=0)
+    pos = os.fstat(file.fileno()).st_size  # start at the end, like tail -f
+    partial = b''
+    try:
+        while True:
+            chunk = os.pread(file.fileno(), _READ_SIZE, pos)
+            if chunk:
+                pos += len(chunk)
+                data = partial + chunk if partial else chunk
+                nl = data.rfind(b'\n')
+                if nl < 0:
+                    partial = data  # no complete line yet
+                    continue
+                partial = data[nl + 1:]
+                # Lines are yielded without the newline; the parsers don't need it
+                yield from data[:nl].decode('utf-8', 'replace').split('\n')
+                continue
+
+            # Caught up (or only a partial line so far). Handle truncation and
+            # rotation before waiting for more writes.
+            st = os.fstat(file.fileno())
+            if st.st_size < pos:
+                print("✂️  Log file truncated; reading from the start")
+                pos = 0
+                partial = b''
+                continue
+
+            try:
+                rotated = os.stat(file_path).st_ino != st.st_ino
+            except FileNotFoundError:
+                rotated = False  # old file moved away, new one not created yet
+            if rotated:
+                print(f"🔁 Log file rotated; reopening {file_path}")
+                file.close()
+                file = open(file_path, 'rb', buffering=0)
+                pos = 0
+                partial = b''
+                inotify = _watch_for_writes(file_path, inotify)
                 continue
 
-            yield line.strip()
+            _wait_for_writes(inotify)
+    finally:
+        file.close()
+
+
+def tail_file(file_path: str):
+    """Tail a file like 'tail -f'"""
+    print(f"📖 Starting to tail log file: {file_path}")
+    
+    # Wait for file to exist
+    while not os.path.exists(file_path):
+        print(f"⏳ Waiting for log file to be created: {file_path}")
+        time.sleep(2)
+    
+    # Block on inotify write events instead of a fixed sleep when available
+    inotify = _watch_for_writes(file_path)
+
+    if stat.S_ISREG(os.stat(file_path).st_mode):
+        yield from _tail_regular(file_path, inotify)
+    else:
+        yield from _tail_stream(file_path, inotify)
 
 
 def main():
     """Main monitoring loop"""
+    global _HOT_LOG
+    _HOT_LOG = _buffered_stderr()
+
     print("=" * 60)
     print("🔍 Blue/Green Log Watcher Started")
     print("=" * 60)
@@ -222,42 +632,54 @@ def main():
     print("=" * 60)
     print()
     
+    threading.Thread(target=_alert_worker, name='slack-alerts', daemon=True).start()
+
     initial_pool = os.getenv('ACTIVE_POOL', 'blue')
     print(f"📍 Expected initial pool: {initial_pool}")
     print()
     
+    lines_seen = 0
+
+    # Bind hot-loop globals to locals (LOAD_FAST instead of LOAD_GLOBAL)
+    _parse = parse_log_fast
+    _push = push_status
+    _check_transition = check_transition
+    _check_error = check_error_rate
+
     try:
         for line in tail_file(LOG_FILE):
-            log_entry = parse_log_line(line)
+            fast = _parse(line)
             
-            if not log_entry:
+            if not fast:
                 continue
             
             # Extract key fields
-            current_pool = log_entry.get('pool', '-')
-            status_code = int(log_entry.get('status', '0'))
-            upstream_status = log_entry.get('upstream_status', '-')
+            current_pool, status_code = fast
 
             # Track status codes in sliding window for ALL requests
-            request_window.append(status_code)
+            _push(status_code)
+            lines_seen += 1
 
             # Only check failover/recovery if pool info is present
             if current_pool != '-':
-                check_failover(current_pool, log_entry)
-                check_recovery(current_pool, initial_pool)
+                _check_transition(current_pool, initial_pool, line)
 
-            # Check for high error rate (always)
-            check_error_rate()
+            # Check for high error rate every 32 requests; alerts are
+            # rate-limited by ALERT_COOLDOWN_SEC anyway
+            if lines_seen & 0x1F == 0:
+                _check_error()
 
             # Log to console (optional, can be verbose)
             if status_code >= 500:
-                print(f"❌ Error: {status_code} | Pool: {current_pool} | URI: {log_entry.get('uri', '-')}")
+                _HOT_LOG.write(f"❌ Error: {status_code} | Pool: {current_pool} | URI: {uri_fast(line)}\n")
             
     except KeyboardInterrupt:
         print("\n👋 Log watcher stopped by user")
     except Exception as e:
         print(f"💥 Fatal error: {e}")
         raise
+    finally:
+        _HOT_LOG.flush()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,58 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled version of watcher.parse_log_fast
+Build with: cythonize -i watcher_fast.pyx
+watcher.py uses it when the built extension is importable from its directory;
+the docker-compose setup does not build or mount it.
+"""
+
+
+cdef Py_ssize_t _find(str line, Py_ssize_t start, Py_ssize_t n, const char* key, Py_ssize_t width):
+    """Index of the first ASCII key in line[start:n], or -1 (like str.find)"""
+    cdef Py_ssize_t i, j
+    for i in range(start, n - width + 1):
+        for j in range(width):
+            if line[i + j] != <Py_UCS4>key[j]:
+                break
+        else:
+            return i
+    return -1
+
+
+cpdef object parse_log_fast(str line):
+    """
+    Extract only (pool, status) from a log line for the per-request hot path.
+    Same contract as the pure-Python watcher.parse_log_fast: the same
+    first-match rules, and the rare non-ASCII-digit or end-of-line values are
+    handed to the same str methods.
+    """
+    cdef Py_ssize_t n = len(line)
+    cdef Py_ssize_t p, s, e, i
+    cdef long status = 0
+    cdef Py_UCS4 c
+
+    if n == 0 or line[0] != u'[':
+        return None
+    p = _find(line, 0, n, b" pool=", 6)
+    if p < 0 or _find(line, 0, p, b"]", 1) < 0:
+        return None  # mirror parse_log_line's rejects so it can re-parse any line we accept
+    p += 6
+    e = _find(line, p, n, b" ", 1)
+    pool = (line[p:e] if e >= 0 else line[p:].rstrip()) or '-'
+
+    s = _find(line, 0, n, b" status=", 8)
+    if s < 0:
+        return pool, 0
+    s += 8
+    e = _find(line, s, n, b" ", 1)
+    if e < 0 or e == s or e - s > 18:
+        value = line[s:e] if e >= 0 else line[s:].rstrip()
+        return pool, int(value) if value.isdecimal() else 0
+
+    for i in range(s, e):
+        c = line[i]
+        if c < u'0' or c > u'9':
+            value = line[s:e]  # non-ASCII digits etc.: defer to str rules
+            return pool, int(value) if value.isdecimal() else 0
+        status = status * 10 + (<long>c - 48)  # 48 == ord('0')
+    return pool, status